@@ -31,6 +31,7 @@ echo "📦 Installing to $INSTALL_DIR..."
 
 cp orchestrator.py "$INSTALL_DIR/"
 cp loop-runner.py "$INSTALL_DIR/"
+cp loop_common.py "$INSTALL_DIR/"
 cp mcp-setup.py "$INSTALL_DIR/"
 cp setup-context-engineered.sh "$INSTALL_DIR/"
 cp setup-native-hooks.sh "$INSTALL_DIR/"
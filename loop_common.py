@@ -0,0 +1,202 @@
+"""
+Context Engine Shared Helpers
+=============================
+Feature bookkeeping shared by orchestrator.py and loop-runner.py, kept in one
+place so the two entry points estimate complexity, read git history and merge
+QA findings the same way.
+"""
+
+import json
+import re
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+
+# Lists the subject of every "session: completed" commit, NUL-terminated;
+# --format=%s skips the abbreviated-hash lookup --oneline would do per commit
+COMPLETED_LOG_CMD = ("git", "log", "-z", "--format=%s", "--grep", "session: completed")
+# Matches the subject every session ends with, anchored to the start of a
+# record so e.g. 'Revert "session: completed F1"' is not counted
+COMPLETED_COMMIT_RE = re.compile(rb"(?:^|\0)session: completed ([^\s\0]+)")
+
+def parse_completed_ids(log_output: bytes) -> set:
+    """Feature IDs from the raw output of COMPLETED_LOG_CMD."""
+    return {m.decode("utf-8", "replace") for m in COMPLETED_COMMIT_RE.findall(log_output)}
+
+# Folds a feature description onto one line. It is quoted on a single
+# @feature-verifier line in the prompts, where a line break would spill the
+# rest of the description out of the subagent invocation
+ONE_LINE_TABLE = str.maketrans({"\r": " ", "\n": " ", "\t": " "})
+
+# ============================================================================
+# QA Fix Features
+# ============================================================================
+
+# QA sessions write their findings to fix-features-<feature id>.json in the
+# project root; the harness merges them into feature_list.json afterwards
+FIX_FEATURES_GLOB = "fix-features-*.json"
+FIX_FEATURES_PREFIX = "fix-features-"
+
+def check_feature_list(data):
+    """Raise ValueError unless parsed feature_list.json is an object with a list of features."""
+    features = data.get("features", []) if isinstance(data, dict) else None
+    if not isinstance(features, list) or not all(isinstance(f, dict) for f in features):
+        raise ValueError("feature_list.json does not hold a list of features")
+
+def merge_fix_features(data: dict, fix_files: list) -> tuple:
+    """
+    Append the features from QA fix-features files to a parsed feature list,
+    skipping IDs it already has (fixes are priority 50-55, so they run before
+    QA at 100+). Returns (number of features added, files merged); files that
+    can't be read or parsed are left out so they can be retried.
+    Raises ValueError if data isn't a feature list.
+    """
+    check_feature_list(data)
+    features = data.setdefault("features", [])
+    existing_ids = {f.get("id") for f in features}
+    added = 0
+    merged = []
+    for fix_file in fix_files:
+        try:
+            fixes = json.loads(Path(fix_file).read_bytes())["features"]
+            fixes = [fix for fix in fixes if isinstance(fix, dict)]
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        for fix in fixes:
+            if fix.get("id") not in existing_ids:
+                features.append(fix)
+                existing_ids.add(fix.get("id"))
+                added += 1
+        merged.append(fix_file)
+    return added, merged
+
+def merge_qa_fix_features(project_path: Path, load_feature_list, save_feature_list) -> tuple:
+    """
+    Merge the fix-features files a QA session left behind into feature_list.json,
+    in-process instead of a python3 heredoc in the session. Merged files are
+    removed and only feature_list.json and those files are committed, so other
+    uncommitted work stays out of the commit.
+    load_feature_list / save_feature_list are the caller's reader and writer,
+    so its caching (and locking) applies. Raises OSError / ValueError if
+    feature_list.json can't be read.
+    Returns (features added, files merged, unreadable files skipped).
+    """
+    fix_files = sorted(project_path.glob(FIX_FEATURES_GLOB))
+    if not fix_files:
+        return 0, [], []
+    
+    feature_file = project_path / "feature_list.json"
+    data = load_feature_list(feature_file)
+    added, merged = merge_fix_features(data, fix_files)
+    if added:
+        save_feature_list(feature_file, data)
+    skipped = [f for f in fix_files if f not in merged]
+    if not merged:
+        return added, merged, skipped
+    
+    # A fix file the session never committed has nothing to stage once removed,
+    # and naming it would fail the whole add/commit
+    names = [f.name for f in merged]
+    tracked = subprocess.run(["git", "ls-files", "-z", "--", *names],
+                             capture_output=True, text=True, cwd=project_path).stdout
+    paths = [feature_file.name, *filter(None, tracked.split("\0"))]
+    for fix_file in merged:
+        fix_file.unlink(missing_ok=True)
+    
+    origins = ", ".join(name[len(FIX_FEATURES_PREFIX):-len(".json")] for name in names)
+    subprocess.run(["git", "add", "-A", "--", *paths], cwd=project_path, capture_output=True)
+    subprocess.run(["git", "commit", "-m", f"session: merged QA fix features from {origins}",
+                    "--", *paths], cwd=project_path, capture_output=True)
+    return added, merged, skipped
+
+# ============================================================================
+# Feature Complexity Detection
+# ============================================================================
+
+HIGH_COMPLEXITY_KEYWORDS = frozenset([
+    'security', 'crypto', 'encrypt', 'auth', 'credential', 'password',
+    'ssh', 'certificate', 'token', 'session', 'permission', 'rbac',
+    'injection', 'sanitize', 'validate', 'vulnerability'
+])
+MEDIUM_COMPLEXITY_KEYWORDS = frozenset([
+    'api', 'endpoint', 'database', 'repository', 'migration', 'schema',
+    'patch', 'system', 'service', 'handler', 'execute', 'command'
+])
+LOW_COMPLEXITY_KEYWORDS = frozenset([
+    'refactor', 'rename', 'cleanup', 'format', 'typo', 'comment', 'docs'
+])
+
+def keyword_pattern(keywords) -> re.Pattern:
+    """One alternation per keyword tier, so a tier is matched in a single scan."""
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords)))
+
+HIGH_COMPLEXITY_RE = keyword_pattern(HIGH_COMPLEXITY_KEYWORDS)
+MEDIUM_COMPLEXITY_RE = keyword_pattern(MEDIUM_COMPLEXITY_KEYWORDS)
+LOW_COMPLEXITY_RE = keyword_pattern(LOW_COMPLEXITY_KEYWORDS)
+
+# Estimates kept for this many distinct features; an overnight run sees far
+# fewer, but a bound keeps a long-lived process from growing without limit
+COMPLEXITY_CACHE_SIZE = 1024
+
+def get_feature_complexity(feature: dict) -> str:
+    """
+    Estimate feature complexity to determine subagent requirements.
+    Returns: 'high', 'medium', or 'low'
+    
+    Can be overridden by setting "complexity" field in feature_list.json
+    
+    High complexity = full subagent ceremony (code-reviewer, test-runner, feature-verifier)
+    Medium complexity = just test-runner
+    Low complexity = just run tests, no subagents
+    """
+    # Manual override takes precedence
+    override = feature.get('complexity', '').lower()
+    if override in ('high', 'medium', 'low'):
+        return override
+    
+    return estimate_complexity(feature.get('category', ''), feature.get('description', ''),
+                               feature.get('name', ''), len(feature.get('dependencies', [])),
+                               len(feature.get('tests', [])))
+
+@lru_cache(maxsize=COMPLEXITY_CACHE_SIZE)
+def estimate_complexity(category: str, description: str, name: str,
+                        num_dependencies: int, num_tests: int) -> str:
+    """Keyword/size based estimate behind get_feature_complexity(), cached per input."""
+    signals = 0
+    
+    category = category.lower()
+    description = description.lower()
+    name = name.lower()
+    
+    # Join the fields once so each tier is a single regex scan.
+    # No keyword contains a newline, so matches can't span two fields.
+    desc_and_category = description + "\n" + category
+    all_text = desc_and_category + "\n" + name
+    
+    # High complexity signals
+    if HIGH_COMPLEXITY_RE.search(all_text):
+        signals += 2
+    
+    if num_dependencies > 3:
+        signals += 1
+    if num_tests > 5:
+        signals += 1
+    
+    # Medium complexity signals
+    if MEDIUM_COMPLEXITY_RE.search(desc_and_category):
+        signals += 1
+    
+    # Low complexity signals
+    if LOW_COMPLEXITY_RE.search(all_text):
+        signals -= 2
+    
+    if 'simple' in name or 'minor' in name:
+        signals -= 1
+    if len(description) < 40:
+        signals -= 1
+    
+    if signals >= 3:
+        return 'high'
+    elif signals <= 0:
+        return 'low'
+    return 'medium'
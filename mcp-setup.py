@@ -464,16 +464,21 @@ def smart_mcp_setup(configurator: MCPConfigurator):
     project_path = configurator.project_path
     context = []
     
-    # Check for common files
-    if (project_path / "package.json").exists():
+    # Check for common files - one directory read instead of a stat() per marker
+    try:
+        with os.scandir(project_path) as it:
+            names = {entry.name for entry in it}
+    except OSError:
+        names = set()
+    if "package.json" in names:
         context.append("Node.js project")
-    if (project_path / "Cargo.toml").exists():
+    if "Cargo.toml" in names:
         context.append("Rust project")
-    if (project_path / "requirements.txt").exists() or (project_path / "pyproject.toml").exists():
+    if "requirements.txt" in names or "pyproject.toml" in names:
         context.append("Python project")
-    if (project_path / "docker-compose.yml").exists():
+    if "docker-compose.yml" in names:
         context.append("Docker Compose found")
-    if (project_path / "kubernetes").exists() or (project_path / "k8s").exists():
+    if "kubernetes" in names or "k8s" in names:
         context.append("Kubernetes manifests found")
     
     # Check for database references
@@ -16,10 +16,14 @@ import os
 import sys
 import time
 import argparse
+import heapq
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
+from loop_common import (COMPLETED_LOG_CMD, ONE_LINE_TABLE, get_feature_complexity,
+                         merge_qa_fix_features, parse_completed_ids)
+
 # ============================================================================
 # Configuration
 # ============================================================================
@@ -36,75 +40,9 @@ DEBUG = False  # Set via --debug flag
 # Feature Complexity Detection
 # ============================================================================
 
-def get_feature_complexity(feature: Dict[str, Any]) -> str:
-    """
-    Estimate feature complexity to determine subagent requirements.
-    Returns: 'high', 'medium', or 'low'
-    
-    Can be overridden by setting "complexity" field in feature_list.json
-    
-    High complexity = full subagent ceremony (code-reviewer, test-runner, feature-verifier)
-    Medium complexity = just test-runner
-    Low complexity = just run tests, no subagents
-    """
-    # Manual override takes precedence
-    override = feature.get('complexity', '').lower()
-    if override in ('high', 'medium', 'low'):
-        return override
-    
-    signals = 0
-    
-    category = feature.get('category', '').lower()
-    description = feature.get('description', '').lower()
-    name = feature.get('name', '').lower()
-    
-    # High complexity signals
-    high_complexity_keywords = [
-        'security', 'crypto', 'encrypt', 'auth', 'credential', 'password',
-        'ssh', 'certificate', 'token', 'session', 'permission', 'rbac',
-        'injection', 'sanitize', 'validate', 'vulnerability'
-    ]
-    for keyword in high_complexity_keywords:
-        if keyword in description or keyword in category or keyword in name:
-            signals += 2
-            break  # Only count once
-    
-    if len(feature.get('dependencies', [])) > 3:
-        signals += 1
-    if len(feature.get('tests', [])) > 5:
-        signals += 1
-    
-    # Medium complexity signals (architecture, API, database, system operations)
-    medium_keywords = ['api', 'endpoint', 'database', 'repository', 'migration', 'schema', 'patch', 'system', 'service', 'handler', 'execute', 'command']
-    for keyword in medium_keywords:
-        if keyword in description or keyword in category:
-            signals += 1
-            break
-    
-    # Low complexity signals
-    low_keywords = ['refactor', 'rename', 'cleanup', 'format', 'typo', 'comment', 'docs']
-    for keyword in low_keywords:
-        if keyword in description or keyword in category or keyword in name:
-            signals -= 2
-            break
-    
-    if 'simple' in name or 'minor' in name:
-        signals -= 1
-    if len(description) < 40:
-        signals -= 1
-    
-    # Determine complexity level
-    if signals >= 3:
-        return 'high'
-    elif signals <= 0:
-        return 'low'
-    return 'medium'
-
-def get_subagent_instructions(complexity: str, feature_id: str, description: str) -> str:
-    """Generate subagent instructions based on complexity level."""
-    
-    if complexity == 'high':
-        return f"""## STEP 7: Invoke Subagents (MANDATORY - High Complexity Feature)
+# The orchestrator's own STEP 7 wording (loop-runner.py has a variant), formatted per feature
+SUBAGENT_INSTRUCTIONS = {
+    'high': """## STEP 7: Invoke Subagents (MANDATORY - High Complexity Feature)
 You MUST invoke these subagents in order:
 
 ### Code Review
@@ -125,21 +63,51 @@ Ensure all tests pass.
 ```
 Confirm feature works end-to-end.
 
-After all subagents pass, proceed to STEP 8."""
+After all subagents pass, proceed to STEP 8.""",
 
-    elif complexity == 'medium':
-        return f"""## STEP 7: Verify Tests (Medium Complexity Feature)
+    'medium': """## STEP 7: Verify Tests (Medium Complexity Feature)
 Invoke the test runner to verify:
 
 ```
 @test-runner Run the test suite and analyze results
 ```
-Ensure all tests pass, then proceed to STEP 8."""
+Ensure all tests pass, then proceed to STEP 8.""",
 
-    else:  # low
-        return """## STEP 7: Verify Tests (Low Complexity Feature)
+    'low': """## STEP 7: Verify Tests (Low Complexity Feature)
 Tests should already pass from STEP 6. If they do, proceed directly to STEP 8.
-No subagent review needed for simple changes - just mark complete."""
+No subagent review needed for simple changes - just mark complete.""",
+}
+
+def get_subagent_instructions(complexity: str, feature_id: str, description: str) -> str:
+    """Generate subagent instructions based on complexity level."""
+    template = SUBAGENT_INSTRUCTIONS.get(complexity, SUBAGENT_INSTRUCTIONS['low'])
+    return template.format(feature_id=feature_id, description=description.translate(ONE_LINE_TABLE))
+
+# Keyed like SUBAGENT_INSTRUCTIONS
+CRITICAL_RULES = {
+    'high': """## CRITICAL RULES
+- DO use Ref MCP to look up docs before coding
+- DO run cargo test before marking complete
+- DO invoke all three subagents (@code-reviewer, @test-runner, @feature-verifier)
+- DO NOT skip any steps
+- DO NOT mark passes: true unless tests pass AND subagents verify
+- DO NOT let any file exceed 500 lines - split into modules if needed
+- If you find existing files over 500 lines, refactor them into smaller modules""",
+
+    'medium': """## CRITICAL RULES
+- DO use Ref MCP to look up docs before coding
+- DO run cargo test before marking complete
+- DO invoke @test-runner to verify tests
+- DO NOT mark passes: true unless tests pass
+- DO NOT let any file exceed 500 lines - split into modules if needed
+- If you find existing files over 500 lines, refactor them into smaller modules""",
+
+    'low': """## CRITICAL RULES
+- DO run cargo test before marking complete
+- DO NOT mark passes: true unless tests pass
+- DO NOT let any file exceed 500 lines - split into modules if needed
+- If you find existing files over 500 lines, refactor them into smaller modules""",
+}
 
 # ============================================================================
 # Color Output
@@ -379,6 +347,24 @@ def create_project_directory(info: Dict[str, Any]) -> Path:
 # Feature Tracking
 # ============================================================================
 
+# feature_file -> ((st_mtime_ns, st_size), parsed feature_list.json)
+FEATURE_CACHE = {}
+
+def load_feature_list(feature_file: Path) -> Dict[str, Any]:
+    """
+    Parse feature_list.json, reusing the last result while the file is unchanged.
+    Raises OSError / json.JSONDecodeError like a plain json.load() would.
+    """
+    st = os.stat(feature_file)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = FEATURE_CACHE.get(feature_file)
+    if cached and cached[0] == key:
+        return cached[1]
+    
+    data = json.loads(feature_file.read_bytes())
+    FEATURE_CACHE[feature_file] = (key, data)
+    return data
+
 def get_feature_status(project_path: Path) -> Dict[str, Any]:
     """Read feature_list.json and return status."""
     feature_file = project_path / "feature_list.json"
@@ -387,8 +373,7 @@ def get_feature_status(project_path: Path) -> Dict[str, Any]:
         return {"total": 0, "completed": 0, "remaining": 0, "blocked": 0, "features": []}
     
     try:
-        with open(feature_file) as f:
-            data = json.load(f)
+        data = load_feature_list(feature_file)
         
         features = data.get("features", [])
         completed = sum(1 for f in features if f.get("passes", False))
@@ -405,16 +390,28 @@ def get_feature_status(project_path: Path) -> Dict[str, Any]:
         return {"total": 0, "completed": 0, "remaining": 0, "blocked": 0, "features": []}
 
 def is_feature_in_git_history(project_path: Path, feature_id: str) -> bool:
-    """Check if feature was completed in git history (backup check)."""
+    """True if a "session: completed" commit names exactly this ID (F1 doesn't match F10)."""
     try:
-        result = subprocess.run(
-            ["git", "log", "--oneline", "--grep", f"session: completed {feature_id}"],
-            capture_output=True, text=True, cwd=project_path, timeout=10
-        )
-        return bool(result.stdout.strip())
-    except:
+        return feature_id in get_completed_ids_from_git(project_path)
+    except (OSError, subprocess.SubprocessError):
         return False
 
+def get_completed_ids_from_git(project_path: Path) -> set:
+    """Collect feature IDs from all "session: completed <id>" commits in one git call."""
+    result = subprocess.run(COMPLETED_LOG_CMD, capture_output=True, cwd=project_path, timeout=10)
+    return parse_completed_ids(result.stdout)
+
+def save_feature_list(feature_file: Path, data: Dict[str, Any]):
+    """Replace feature_list.json atomically, so a crash can't truncate it."""
+    FEATURE_CACHE.pop(feature_file, None)
+    tmp_file = feature_file.with_name(feature_file.name + ".tmp")
+    new_bytes = json.dumps(data, indent=2).encode()
+    with open(tmp_file, "wb") as f:
+        f.write(new_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, feature_file)
+
 def sync_features_with_git(project_path: Path) -> int:
     """Sync feature_list.json with git history. Returns number of fixes."""
     feature_file = project_path / "feature_list.json"
@@ -423,21 +420,25 @@ def sync_features_with_git(project_path: Path) -> int:
         return 0
     
     try:
-        with open(feature_file) as f:
-            data = json.load(f)
+        data = load_feature_list(feature_file)
+        
+        unfinished = [feat for feat in data.get("features", []) if not feat.get("passes", False)]
+        if not unfinished:
+            return 0
+        
+        # One history scan for all features instead of a git log per feature
+        completed_ids = get_completed_ids_from_git(project_path)
         
         fixes = 0
-        for feat in data.get("features", []):
-            if not feat.get("passes", False):
-                feature_id = feat.get("id", "")
-                if is_feature_in_git_history(project_path, feature_id):
-                    print_status(f"Fixing {feature_id}: found in git history, marking as passed", "working")
-                    feat["passes"] = True
-                    fixes += 1
+        for feat in unfinished:
+            feature_id = feat.get("id", "")
+            if feature_id in completed_ids:
+                print_status(f"Fixing {feature_id}: found in git history, marking as passed", "working")
+                feat["passes"] = True
+                fixes += 1
         
         if fixes > 0:
-            with open(feature_file, "w") as f:
-                json.dump(data, f, indent=2)
+            save_feature_list(feature_file, data)
             print_status(f"Fixed {fixes} feature(s) from git history", "success")
         
         return fixes
@@ -448,16 +449,18 @@ def sync_features_with_git(project_path: Path) -> int:
 def get_next_feature(project_path: Path) -> Optional[Dict[str, Any]]:
     """Get the next feature to implement."""
     status = get_feature_status(project_path)
-    
-    for feat in sorted(status["features"], key=lambda x: x.get("priority", 99)):
+    features = status["features"]
+    passed_ids = {f.get("id") for f in features if f.get("passes", False)}
+    
+    # Pop in priority order (file order breaks ties, as the stable sort did)
+    # and stop at the first ready feature instead of sorting the whole list
+    heap = [(feat.get("priority", 99), i) for i, feat in enumerate(features)]
+    heapq.heapify(heap)
+    while heap:
+        feat = features[heapq.heappop(heap)[1]]
         if not feat.get("passes", False) and not feat.get("blocked", False):
             # Check dependencies
-            deps = feat.get("dependencies", [])
-            deps_met = all(
-                any(f.get("id") == dep and f.get("passes", False) for f in status["features"])
-                for dep in deps
-            )
-            if deps_met or not deps:
+            if all(dep in passed_ids for dep in feat.get("dependencies", [])):
                 return feat
     
     return None
@@ -682,29 +685,8 @@ cat > fix-features-{feature_id}.json << 'EOF'
 EOF
 ```
 
-Then merge into feature_list.json:
-```bash
-python3 << 'PYEOF'
-import json
-
-with open('feature_list.json') as f:
-    main = json.load(f)
-
-with open('fix-features-{feature_id}.json') as f:
-    fixes = json.load(f)
-
-# Add fixes (priority 50-55 runs before QA at 100+)
-for fix in fixes['features']:
-    # Avoid duplicates
-    if not any(f['id'] == fix['id'] for f in main['features']):
-        main['features'].append(fix)
-
-with open('feature_list.json', 'w') as f:
-    json.dump(main, f, indent=2)
-
-print(f"Added {{len(fixes['features'])}} fix features from QA")
-PYEOF
-```
+Leave the file in the project root - the harness merges it into
+feature_list.json after this session (IDs already in the list are skipped).
 
 Record failures for context:
 ```bash
@@ -758,30 +740,7 @@ def build_implement_prompt(feature: Dict[str, Any], session_num: int) -> str:
     complexity = get_feature_complexity(feature)
     subagent_instructions = get_subagent_instructions(complexity, feature_id, description)
     
-    # Adjust critical rules based on complexity
-    if complexity == 'high':
-        critical_rules = """## CRITICAL RULES
-- DO use Ref MCP to look up docs before coding
-- DO run cargo test before marking complete
-- DO invoke all three subagents (@code-reviewer, @test-runner, @feature-verifier)
-- DO NOT skip any steps
-- DO NOT mark passes: true unless tests pass AND subagents verify
-- DO NOT let any file exceed 500 lines - split into modules if needed
-- If you find existing files over 500 lines, refactor them into smaller modules"""
-    elif complexity == 'medium':
-        critical_rules = """## CRITICAL RULES
-- DO use Ref MCP to look up docs before coding
-- DO run cargo test before marking complete
-- DO invoke @test-runner to verify tests
-- DO NOT mark passes: true unless tests pass
-- DO NOT let any file exceed 500 lines - split into modules if needed
-- If you find existing files over 500 lines, refactor them into smaller modules"""
-    else:
-        critical_rules = """## CRITICAL RULES
-- DO run cargo test before marking complete
-- DO NOT mark passes: true unless tests pass
-- DO NOT let any file exceed 500 lines - split into modules if needed
-- If you find existing files over 500 lines, refactor them into smaller modules"""
+    critical_rules = CRITICAL_RULES.get(complexity, CRITICAL_RULES['low'])
     
     return f"""Session {session_num}: Implement feature [{complexity.upper()} complexity]
 
@@ -877,7 +836,6 @@ def run_claude_code(
         "--model", model,
         "--permission-mode", "bypassPermissions",
         "--output-format", "text",
-        prompt
     ]
     
     print_status(f"Running Claude Code ({model})...", "working")
@@ -885,8 +843,11 @@ def run_claude_code(
     start_time = time.time()
     
     try:
+        # Prompt goes in on stdin: prompts embed whole feature specs, and on
+        # argv they would be copied through execve and count against ARG_MAX
         result = subprocess.run(
             cmd,
+            input=prompt,
             cwd=project_path,
             capture_output=True,
             text=True,
@@ -1099,6 +1060,18 @@ def orchestrate_implementation(project_path: Path, model: str = DEFAULT_MODEL, s
         result = run_claude_code_interactive(project_path, prompt, model)
         log_session(project_path, session_num, result, feature)
         
+        # Fold in the fix features a QA session generated
+        try:
+            added, merged, skipped = merge_qa_fix_features(project_path, load_feature_list,
+                                                           save_feature_list)
+            for fix_file in skipped:
+                print_status(f"Skipping unreadable {fix_file.name}", "warning")
+            if merged:
+                print_status(f"Merged {added} QA fix feature(s) from "
+                             f"{', '.join(f.name for f in merged)}", "success")
+        except (OSError, ValueError) as e:
+            print_status(f"Could not merge QA fix features: {e}", "warning")
+        
         # Check result
         new_status = get_feature_status(project_path)
         